@@ -0,0 +1,80 @@
+"""
+Design rule checks against manufacturer constraints, shared by the coil generators
+"""
+
+VIA_HOLE_DIAMETER = 0.3   # mm
+VIA_HOLE_TO_TRACK = 0.2   # mm (via hole edge to track edge)
+SAME_NET_SPACING = 0.15   # mm (track edge to track edge, trace coils)
+MIN_TRACK_WIDTH = 0.15    # mm (trace coil min width)
+
+
+def _track_errors(track_width, spacing):
+    """Same-net spacing and minimum width checks common to every coil shape"""
+    errors = []
+
+    # Same-net track spacing: gap = spacing - track_width (spacing is center-to-center)
+    track_gap = spacing - track_width
+    if track_gap < SAME_NET_SPACING:
+        errors.append(
+            f"Same-net track spacing too small.\n"
+            f"  Track gap (spacing - track_width): {track_gap:.3f} mm\n"
+            f"  Minimum required: {SAME_NET_SPACING} mm"
+        )
+
+    # Minimum track width check
+    if track_width < MIN_TRACK_WIDTH:
+        errors.append(
+            f"Track width too small.\n"
+            f"  Track width: {track_width} mm\n"
+            f"  Minimum required: {MIN_TRACK_WIDTH} mm"
+        )
+    return errors
+
+
+def check_radial(inner_radius, track_width, spacing, radius_label="Inner radius"):
+    """DRC for spirals wound around the via (circular, elliptical, star); returns a list of error messages"""
+    errors = []
+
+    # Via hole to track: center to nearest trace must fit via hole + clearance
+    min_required = VIA_HOLE_DIAMETER / 2 + VIA_HOLE_TO_TRACK + track_width / 2
+    if inner_radius < min_required:
+        errors.append(
+            f"Inner clearance too small for via.\n"
+            f"  {radius_label}: {inner_radius:.3f} mm\n"
+            f"  Minimum required: {min_required:.3f} mm  "
+            f"(via_hole/2={VIA_HOLE_DIAMETER/2} + hole_to_track={VIA_HOLE_TO_TRACK} + track_width/2={track_width/2})"
+        )
+    return errors + _track_errors(track_width, spacing)
+
+
+def check_rectangular(inner_width, inner_height, track_width, spacing):
+    """
+    DRC for spirals that wind inward to an open rectangle around the via; returns
+    a list of error messages. Pass inner_height=None for a square coil.
+    """
+    errors = []
+
+    # Via hole to track: inner open area must fit via hole + clearance on each side
+    min_required = VIA_HOLE_DIAMETER + 2 * (VIA_HOLE_TO_TRACK + track_width / 2)
+    if inner_height is None:
+        inner_ok = inner_width >= min_required
+        dims = f"  Innermost open side: {inner_width:.3f} mm\n  Minimum required:    "
+    else:
+        inner_ok = min(inner_width, inner_height) >= min_required
+        dims = f"  Innermost open dimensions: {inner_width:.3f} x {inner_height:.3f} mm\n  Minimum required: "
+    if not inner_ok:
+        errors.append(
+            f"Inner clearance too small for via.\n"
+            f"{dims}{min_required:.3f} mm  "
+            f"(via_hole={VIA_HOLE_DIAMETER} + 2*(hole_to_track={VIA_HOLE_TO_TRACK} + track_width/2={track_width/2}))"
+        )
+    return errors + _track_errors(track_width, spacing)
+
+
+def report(errors):
+    """Print DRC errors, if any, in the generators' usual format"""
+    if errors:
+        print("ERROR: DRC violations detected:")
+        for i, e in enumerate(errors, 1):
+            print(f"  [{i}] {e}")
+        print("  Fix parameters before generating the coil.")
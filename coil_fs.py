@@ -0,0 +1,39 @@
+"""
+Output directory helpers shared by the coil generators and coil_to_footprint.py
+"""
+
+import os
+
+
+# Output directories already checked or created by this process, so batch
+# runs only stat each one once
+_ensured_dirs = set()
+
+
+def _ensure_directory(path, label):
+    """Create path if needed, at most one check per path per process"""
+    if path in _ensured_dirs:
+        return path
+    if not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
+        print(f"Created {label} directory: {path}")
+    _ensured_dirs.add(path)
+    return path
+
+
+def ensure_coil_footprints_directory(project_name=None):
+    """Ensure the coil_footprints[/<project_name>] directory exists, create it if it doesn't"""
+    if project_name:
+        coil_footprints_dir = os.path.join(os.getcwd(), "coil_footprints", project_name)
+    else:
+        coil_footprints_dir = os.path.join(os.getcwd(), "coil_footprints")
+    return _ensure_directory(coil_footprints_dir, "coil_footprints")
+
+
+def ensure_coil_json_directory(project_name=None):
+    """Ensure the coil_json[/<project_name>] directory exists, create it if it doesn't"""
+    if project_name:
+        coil_json_dir = os.path.join(os.getcwd(), "coil_json", project_name)
+    else:
+        coil_json_dir = os.path.join(os.getcwd(), "coil_json")
+    return _ensure_directory(coil_json_dir, "coil_json")
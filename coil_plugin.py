@@ -1,4 +1,5 @@
 import pcbnew
+import gzip
 import json
 import wx
 import math
@@ -11,11 +12,16 @@ CENTER_Y = 100
 
 
 def create_tracks(board, group, net, layer, thickness, coords):
+    if isinstance(coords, dict):
+        # schema version 2: column-major {"x": [...], "y": [...]}
+        pairs = zip(coords["x"], coords["y"])
+    else:
+        pairs = ((coord["x"], coord["y"]) for coord in coords)
     last_x = None
     last_y = None
-    for coord in coords:
-        x = coord["x"] + CENTER_X
-        y = coord["y"] + CENTER_Y
+    for x, y in pairs:
+        x += CENTER_X
+        y += CENTER_Y
         track = pcbnew.PCB_TRACK(board)
         if last_x is not None:
             track.SetStart(pcbnew.VECTOR2I_MM(float(last_x), float(last_y)))
@@ -40,10 +46,11 @@ class CoilPlugin(pcbnew.ActionPlugin):
 
     def Run(self):
         # launch a file picker dialog to get the coil file
-        dialog = wx.FileDialog(None, "Choose a coil file", "", "", "*.json", wx.FD_OPEN)
+        dialog = wx.FileDialog(None, "Choose a coil file", "", "", "*.json;*.json.gz", wx.FD_OPEN)
         if dialog.ShowModal() == wx.ID_OK:
-            # read the file
-            with open(dialog.GetPath(), "r") as f:
+            # read the file, which may be gzip-compressed
+            path = dialog.GetPath()
+            with (gzip.open(path, "rt") if path.endswith(".gz") else open(path, "r")) as f:
                 board = pcbnew.GetBoard()
                 # load up the JSON with the coil parameters
                 coil_data = json.load(f)
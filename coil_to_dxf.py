@@ -6,6 +6,7 @@ This script reads a coil JSON file (generated by gen_*_coil.py scripts) and
 exports the track geometry to a DXF file for use in CAD applications.
 """
 
+import gzip
 import json
 import argparse
 import os
@@ -39,13 +40,14 @@ def coil_json_to_dxf(json_path, dxf_path=None, layer_mapping=None):
             'edgeCuts': 'EDGE_CUTS'
         }
 
-    # Load the JSON file
-    with open(json_path, 'r') as f:
+    # Load the JSON file (gzip-compressed if it ends in .gz)
+    compressed = json_path.endswith('.gz')
+    with (gzip.open(json_path, 'rt') if compressed else open(json_path, 'r')) as f:
         coil_data = json.load(f)
 
     # Generate output path if not provided
     if dxf_path is None:
-        base_name = os.path.splitext(json_path)[0]
+        base_name = os.path.splitext(json_path[:-3] if compressed else json_path)[0]
         dxf_path = f"{base_name}.dxf"
 
     # Create a new DXF document
@@ -144,15 +146,20 @@ def _add_polyline(msp, points, layer, width=None):
 
     Args:
         msp: Modelspace object
-        points (list): List of point dictionaries with 'x' and 'y' keys
+        points (list or dict): List of point dictionaries with 'x' and 'y' keys,
+            or a {'x': [...], 'y': [...]} dictionary of coordinate lists
+            (schema version 2)
         layer (str): Layer name
         width (float): Line width (optional)
     """
-    if not points or len(points) < 2:
-        return
-
     # Convert points to tuples
-    point_tuples = [(p['x'], p['y']) for p in points]
+    if isinstance(points, dict):
+        point_tuples = list(zip(points['x'], points['y']))
+    else:
+        point_tuples = [(p['x'], p['y']) for p in points]
+
+    if len(point_tuples) < 2:
+        return
 
     # Create polyline
     if width is not None:
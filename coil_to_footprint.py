@@ -2,13 +2,213 @@
 """
 Standalone script to convert coil JSON files to KiCad footprint files (.kicad_mod)
 Usage: python coil_to_footprint.py [input.json] [output.kicad_mod]
-       python coil_to_footprint.py --batch [input_dir] [output_dir]
+       python coil_to_footprint.py --batch [input_dir] [output_dir] [--force]
+
+Gzip-compressed coil files (.json.gz) are read transparently.
+
+Batch mode skips coils whose JSON has not changed since the last run
+(tracked in coil_footprints/.cache.json); pass --force to rebuild them all.
 """
 
+import gzip
+import hashlib
+import io
 import json
 import sys
 import os
-import argparse
+from coil_fs import ensure_coil_footprints_directory
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    # orjson is optional; fall back to the standard library parser, which
+    # also accepts raw bytes
+    orjson = None
+    _loads = json.loads
+
+
+# Line templates for the footprint S-expressions. Coordinates and sizes are
+# written with 4 decimals (0.1 um), well below KiCad's manufacturing grid;
+# the default float repr would emit up to 17 significant digits per value.
+# %-formatting with fixed precision is also faster than str.format here.
+_FP_LINE_TMPL = '  (fp_line (start %.4f %.4f) (end %.4f %.4f) (stroke (width %.4f) (type solid)) (layer "%s"))\n'
+_VIA_TMPL = '  (pad "" np_thru_hole circle (at %.4f %.4f) (size %.4f %.4f) (drill %.4f) (layers "*.Cu" "*.Mask"))\n'
+_PAD_TMPL = '  (pad "%s" smd rect (at %.4f %.4f) (size %.4f %.4f) (layers %s))\n'
+_FP_TEXT_TMPL = (
+    '  (fp_text user "%s" (at %.4f %.4f) (layer "%s")\n'
+    '    (effects (font (size %.4f %.4f) (thickness 0.15)))\n'
+    '%s'  # optional t_justify line
+    '  )\n'
+)
+
+_INTERNAL_LAYERS = ("In1.Cu", "In2.Cu", "In3.Cu", "In4.Cu", "In5.Cu", "In6.Cu")
+
+# Batch mode records the SHA-256 of each input JSON here, keyed by the output
+# path relative to coil_footprints/, so unchanged coils are not regenerated
+_BATCH_CACHE_FILENAME = ".cache.json"
+
+# Version 2 of the coil JSON schema stores each track's points column-major,
+# "pts": {"x": [...], "y": [...]}, instead of one {"x", "y"} object per point
+# (version 1). Readers here and in coil_plugin.py / coil_to_dxf.py accept both.
+JSON_SCHEMA_VERSION = 2
+
+# Array track points are written to JSON rounded to 1 nm (KiCad's internal
+# unit). Anything finer is float noise, and the shorter numbers roughly halve
+# the file size.
+_JSON_DECIMALS = 6
+
+# Coil files ending in .gz are gzip-compressed. Level 1 is several times
+# faster than the default 6 and still more than halves coordinate JSON.
+_GZIP_SUFFIX = ".gz"
+_GZIP_LEVEL = 1
+
+def _numpy_scalar(value):
+    """JSON fallback for NumPy scalars (e.g. np.int64 turns from a parameter sweep)"""
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Encoder for the small, non-point parts of a streamed coil JSON file. NumPy
+# scalars are accepted like the orjson path does with OPT_SERIALIZE_NUMPY.
+_compact_encode = json.JSONEncoder(separators=(',', ':'), default=_numpy_scalar).encode
+
+
+def _track_columns(points):
+    """Return a track's points as (xs, ys) lists, whatever form they are stored in"""
+    if hasattr(points, "tolist"):
+        # (N, 2) NumPy array, read column by column; this also works on
+        # reversed (negative stride) views
+        return points[:, 0].tolist(), points[:, 1].tolist()
+    if isinstance(points, dict):
+        # Schema version 2: column-major {"x": [...], "y": [...]}
+        return points["x"], points["y"]
+    if points and isinstance(points[0], dict):
+        # Schema version 1: [{"x", "y"}, ...]
+        return [p["x"] for p in points], [p["y"] for p in points]
+    # (x, y) pairs handed over directly by a generator
+    return [p[0] for p in points], [p[1] for p in points]
+
+
+def _emit_tracks(buf, track_list, layer_name):
+    """Write one fp_line per segment of every track in track_list"""
+    for track in track_list:
+        xs, ys = _track_columns(track["pts"])
+        width = track["width"]
+        # A list comprehension is measurably faster than a generator here
+        buf.writelines([
+            _FP_LINE_TMPL % (ax, ay, bx, by, width, layer_name)
+            for ax, ay, bx, by in zip(xs, ys, xs[1:], ys[1:])
+        ])
+
+
+def _write_bytes(path, payload):
+    """Write payload to path with raw os.write calls (normally just one)"""
+    # O_BINARY only exists on Windows, where it stops newline translation
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _json_columns(points):
+    """Return a track's points as the column-major {"x": [...], "y": [...]} JSON form"""
+    if hasattr(points, "tolist"):
+        points = points.round(_JSON_DECIMALS)
+    xs, ys = _track_columns(points)
+    return {"x": xs, "y": ys}
+
+
+def with_point_columns(coil_data):
+    """Return a copy of coil_data in the version 2 JSON schema, with column-major track points"""
+    def convert(track):
+        return {**track, "pts": _json_columns(track["pts"])}
+
+    tracks = coil_data["tracks"]
+    return {
+        **coil_data,
+        "parameters": {**coil_data["parameters"], "schemaVersion": JSON_SCHEMA_VERSION},
+        "tracks": {
+            "f": [convert(track) for track in tracks["f"]],
+            "b": [convert(track) for track in tracks["b"]],
+            "in": [[convert(track) for track in track_list] for track_list in tracks["in"]],
+        },
+    }
+
+
+def _stream_column(f, values, chunk_size=4096):
+    """Write a JSON number array, chunk_size values at a time"""
+    f.write('[')
+    for start in range(0, len(values), chunk_size):
+        # float() first: columns taken from list or dict points may hold NumPy
+        # scalars, whose repr under NumPy 2 is "np.float64(0.5)"
+        chunk = map(float, values[start:start + chunk_size])
+        f.write((',' if start else '') + ','.join(map(float.__repr__, chunk)))
+    f.write(']')
+
+
+def _stream_track(f, track):
+    """Write one track object, streaming its point columns"""
+    fields = [
+        _compact_encode(key) + ':' + _compact_encode(value)
+        for key, value in track.items() if key != "pts"
+    ]
+    columns = _json_columns(track["pts"])
+    f.write('{' + ','.join(fields) + (',' if fields else '') + '"pts":{"x":')
+    _stream_column(f, columns["x"])
+    f.write(',"y":')
+    _stream_column(f, columns["y"])
+    f.write('}}')
+
+
+def _stream_track_list(f, track_list):
+    f.write('[')
+    for i, track in enumerate(track_list):
+        if i:
+            f.write(',')
+        _stream_track(f, track)
+    f.write(']')
+
+
+def write_coil_json(coil_data, file_path):
+    """Write coil data to a compact JSON file, serializing with orjson when it is installed"""
+    # The file is machine-generated and read back by the plugin and the
+    # converters, so no indentation: it is several times smaller and faster
+    # to produce than the indented form
+    # A file_path ending in .gz is written gzip-compressed
+    compress = file_path.endswith(_GZIP_SUFFIX)
+    if orjson is not None:
+        # Parameters, vias and pads may hold NumPy scalars (e.g. a center
+        # taken from a compute_spirals sweep), which orjson rejects by default
+        payload = orjson.dumps(with_point_columns(coil_data), option=orjson.OPT_SERIALIZE_NUMPY)
+        _write_bytes(file_path, gzip.compress(payload, _GZIP_LEVEL) if compress else payload)
+        return
+
+    # Without orjson, stream the file instead: the track point columns go out
+    # in chunks, and everything else is small and goes through the json module
+    coil_data = {**coil_data, "parameters": {**coil_data["parameters"], "schemaVersion": JSON_SCHEMA_VERSION}}
+    with (gzip.open(file_path, 'wt', _GZIP_LEVEL) if compress else open(file_path, 'w')) as f:
+        f.write('{')
+        for i, (key, value) in enumerate(coil_data.items()):
+            f.write((',' if i else '') + _compact_encode(key) + ':')
+            if key != "tracks":
+                f.write(_compact_encode(value))
+                continue
+            f.write('{"f":')
+            _stream_track_list(f, value["f"])
+            f.write(',"b":')
+            _stream_track_list(f, value["b"])
+            f.write(',"in":[')
+            for j, track_list in enumerate(value["in"]):
+                if j:
+                    f.write(',')
+                _stream_track_list(f, track_list)
+            f.write(']}')
+        f.write('}')
 
 
 def generate_footprint_file(coil_data, output_path):
@@ -22,138 +222,171 @@ def generate_footprint_file(coil_data, output_path):
     # Get footprint name from filename
     footprint_name = os.path.splitext(os.path.basename(output_path))[0]
     
-    # Start building the footprint file content
-    lines = []
-    lines.append("(footprint \"{}\"".format(footprint_name))
-    lines.append("  (version 20211014)")
-    lines.append("  (generator pcbnew)")
-    lines.append("  (generator_version \"7.0.0\")")
-    lines.append("  (layer \"F.Cu\")")
-    lines.append("  (descr \"Custom coil footprint generated from JSON\")")
-    lines.append("  (tags \"coil custom\")")
-    lines.append("  (attr smd)")
-    lines.append("  (fp_text reference \"REF**\" (at 0 -2.5) (layer \"F.SilkS\")")
-    lines.append("    (effects (font (size 1 1) (thickness 0.15)))")
-    lines.append("  )")
-    lines.append("  (fp_text value \"{}\" (at 0 2.5) (layer \"F.Fab\")".format(footprint_name))
-    lines.append("    (effects (font (size 1 1) (thickness 0.15)))")
-    lines.append("  )")
-    
-    # Add tracks from front layer
-    for track in coil_data["tracks"]["f"]:
-        points = track["pts"]
-        if len(points) >= 2:
-            for i in range(len(points) - 1):
-                start = points[i]
-                end = points[i + 1]
-                lines.append("  (fp_line (start {} {}) (end {} {}) (stroke (width {}) (type solid)) (layer \"F.Cu\"))".format(
-                    start["x"], start["y"], end["x"], end["y"], track["width"]
-                ))
+    # Build the footprint file content in memory; bind write once since it is
+    # called for every segment of the coil
+    buf = io.StringIO()
+    write = buf.write
+    write(f'(footprint "{footprint_name}"\n')
+    write('  (version 20211014)\n')
+    write('  (generator pcbnew)\n')
+    write('  (generator_version "7.0.0")\n')
+    write('  (layer "F.Cu")\n')
+    write('  (descr "Custom coil footprint generated from JSON")\n')
+    write('  (tags "coil custom")\n')
+    write('  (attr smd)\n')
+    write('  (fp_text reference "REF**" (at 0 -2.5) (layer "F.SilkS")\n')
+    write('    (effects (font (size 1 1) (thickness 0.15)))\n')
+    write('  )\n')
+    write(f'  (fp_text value "{footprint_name}" (at 0 2.5) (layer "F.Fab")\n')
+    write('    (effects (font (size 1 1) (thickness 0.15)))\n')
+    write('  )\n')
     
-    # Add tracks from back layer
-    for track in coil_data["tracks"]["b"]:
-        points = track["pts"]
-        if len(points) >= 2:
-            for i in range(len(points) - 1):
-                start = points[i]
-                end = points[i + 1]
-                lines.append("  (fp_line (start {} {}) (end {} {}) (stroke (width {}) (type solid)) (layer \"B.Cu\"))".format(
-                    start["x"], start["y"], end["x"], end["y"], track["width"]
-                ))
-    
-    # Add internal layer tracks
-    internal_layers = ["In1.Cu", "In2.Cu", "In3.Cu", "In4.Cu", "In5.Cu", "In6.Cu"]
-    for i, track_list in enumerate(coil_data["tracks"]["in"]):
-        if i < len(internal_layers):
-            layer_name = internal_layers[i]
-            for track in track_list:
-                points = track["pts"]
-                if len(points) >= 2:
-                    for j in range(len(points) - 1):
-                        start = points[j]
-                        end = points[j + 1]
-                        lines.append("  (fp_line (start {} {}) (end {} {}) (stroke (width {}) (type solid)) (layer \"{}\"))".format(
-                            start["x"], start["y"], end["x"], end["y"], track["width"], layer_name
-                        ))
+    # Add tracks: front, back, then internal layers (zip drops any internal
+    # track lists beyond In6)
+    tracks = coil_data["tracks"]
+    layer_work = [("F.Cu", tracks["f"]), ("B.Cu", tracks["b"])]
+    layer_work.extend(zip(_INTERNAL_LAYERS, tracks["in"]))
+    for layer_name, track_list in layer_work:
+        _emit_tracks(buf, track_list, layer_name)
     
     # Add vias
     for via in coil_data["vias"]:
-        lines.append("  (pad \"\" np_thru_hole circle (at {} {}) (size {} {}) (drill {}) (layers \"*.Cu\" \"*.Mask\"))".format(
-            via["x"], via["y"], via_diameter, via_diameter, via_drill_diameter
-        ))
+        write(_VIA_TMPL % (via["x"], via["y"], via_diameter, via_diameter, via_drill_diameter))
     
     # Add pads
     for i, pad in enumerate(coil_data["pads"]):
         pad_num = str(i + 1)  # Simple numbering
         if pad.get("layer", "f") == "b":
-            layers = "\"B.Cu\" \"B.Paste\" \"B.Mask\""
+            layers = '"B.Cu" "B.Paste" "B.Mask"'
         else:
-            layers = "\"F.Cu\" \"F.Paste\" \"F.Mask\""
-        lines.append("  (pad \"{}\" smd rect (at {} {}) (size {} {}) (layers {}))".format(
-            pad_num, pad["x"], pad["y"], pad["width"], pad["height"], layers
-        ))
+            layers = '"F.Cu" "F.Paste" "F.Mask"'
+        write(_PAD_TMPL % (pad_num, pad["x"], pad["y"], pad["width"], pad["height"], layers))
     
     # Add silk screen elements
     for text in coil_data["silk"]:
         layer = "F.SilkS" if text["layer"] == "f" else "B.SilkS"
-        lines.append("  (fp_text user \"{}\" (at {} {}) (layer \"{}\")".format(
-            text["text"], text["x"], text["y"], layer
-        ))
-        lines.append("    (effects (font (size {} {}) (thickness 0.15)))".format(text["size"], text["size"]))
-        if "angle" in text and text["angle"] != 0:
-            lines.append("    (t_justify (angle {}))".format(text["angle"]))
-        lines.append("  )")
+        angle = text.get("angle", 0)
+        justify = f'    (t_justify (angle {angle}))\n' if angle != 0 else ""
+        write(_FP_TEXT_TMPL % (text["text"], text["x"], text["y"], layer, text["size"], text["size"], justify))
     
     # Add edge cuts
     for edge_cut in coil_data["edgeCuts"]:
-        if len(edge_cut) >= 2:
-            for i in range(len(edge_cut) - 1):
-                start = edge_cut[i]
-                end = edge_cut[i + 1]
-                lines.append("  (fp_line (start {} {}) (end {} {}) (stroke (width 0.1) (type solid)) (layer \"Edge.Cuts\"))".format(
-                    start["x"], start["y"], end["x"], end["y"]
-                ))
-            # Close the polygon if it's not already closed
-            if len(edge_cut) > 2:
-                start = edge_cut[-1]
-                end = edge_cut[0]
-                lines.append("  (fp_line (start {} {}) (end {} {}) (stroke (width 0.1) (type solid)) (layer \"Edge.Cuts\"))".format(
-                    start["x"], start["y"], end["x"], end["y"]
-                ))
+        # Polygons (more than two points) get a closing segment back to the start
+        ends = edge_cut[1:] + edge_cut[:1] if len(edge_cut) > 2 else edge_cut[1:]
+        buf.writelines([
+            _FP_LINE_TMPL % (start["x"], start["y"], end["x"], end["y"], 0.1, "Edge.Cuts")
+            for start, end in zip(edge_cut, ends)
+        ])
     
-    lines.append(")")
+    write(")\n")
     
-    # Write the footprint file
-    with open(output_path, 'w') as f:
-        f.write('\n'.join(lines))
+    # Write the footprint file: encode once and hand the bytes straight to the
+    # OS, bypassing the buffered text layer
+    _write_bytes(output_path, buf.getvalue().encode('utf-8'))
 
 
-def ensure_coil_footprints_directory(project_name=None):
-    """Ensure the coil_footprints[/<project_name>] directory exists, create it if it doesn't"""
-    if project_name:
-        coil_footprints_dir = os.path.join(os.getcwd(), "coil_footprints", project_name)
-    else:
-        coil_footprints_dir = os.path.join(os.getcwd(), "coil_footprints")
-    if not os.path.exists(coil_footprints_dir):
-        os.makedirs(coil_footprints_dir)
-        print(f"Created coil_footprints directory: {coil_footprints_dir}")
-    return coil_footprints_dir
+def is_coil_file(filename):
+    """True for coil JSON files, plain (.json) or gzip-compressed (.json.gz)"""
+    return filename.endswith(('.json', '.json' + _GZIP_SUFFIX))
+
+
+def footprint_filename(coil_filename):
+    """Name of the .kicad_mod footprint for a coil JSON file name"""
+    if coil_filename.endswith(_GZIP_SUFFIX):
+        coil_filename = coil_filename[:-len(_GZIP_SUFFIX)]
+    return os.path.splitext(coil_filename)[0] + '.kicad_mod'
+
+
+def _unique_by_footprint(entries, indent=""):
+    """
+    Drop coil files whose footprint name another file already claims.
+
+    foo.json and foo.json.gz both convert to foo.kicad_mod; converting both
+    would race two workers on one output and flip its cache entry every run.
+    The .json.gz file is kept and a warning is printed for the other.
+
+    Args:
+        entries (list): os.DirEntry objects of coil files, sorted by name.
+        indent (str): Prefix for the warning lines.
+
+    Returns:
+        list: The kept entries, in their original order.
+    """
+    kept = {}
+    for entry in entries:
+        output_filename = footprint_filename(entry.name)
+        other = kept.get(output_filename)
+        if other is None:
+            kept[output_filename] = entry
+            continue
+        if entry.name.endswith(_GZIP_SUFFIX) and not other.name.endswith(_GZIP_SUFFIX):
+            kept[output_filename], skipped = entry, other
+        else:
+            skipped = entry
+        print(f"{indent}Warning: skipping {skipped.name}, {kept[output_filename].name} also converts to {output_filename}")
+    kept_ids = {id(entry) for entry in kept.values()}
+    return [entry for entry in entries if id(entry) in kept_ids]
+
+
+def _read_coil_bytes(path):
+    """Raw JSON bytes of a coil file, decompressing .gz files"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return gzip.decompress(raw) if path.endswith(_GZIP_SUFFIX) else raw
+
+
+def _load_batch_cache(cache_path):
+    """Load the batch input-hash cache, or an empty one if it is missing or unreadable"""
+    try:
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
 
-def ensure_coil_json_directory():
-    """Ensure the coil_json directory exists, create it if it doesn't"""
-    coil_json_dir = os.path.join(os.getcwd(), "coil_json")
-    if not os.path.exists(coil_json_dir):
-        os.makedirs(coil_json_dir)
-        print(f"Created coil_json directory: {coil_json_dir}")
-    return coil_json_dir
+def _save_batch_cache(cache_path, cache):
+    """Write the batch cache atomically so an interrupted run can't corrupt it"""
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def _convert_one(task):
+    """
+    Convert one batch entry unless its input is unchanged since the last run.
+
+    Args:
+        task (tuple): (input_path, output_path, cached_digest), where
+            cached_digest is the SHA-256 recorded for output_path, or None.
+
+    Returns:
+        tuple: (error, digest, unchanged). error is None on success.
+    """
+    input_path, output_path, cached_digest = task
+    digest = None
+    try:
+        raw = _read_coil_bytes(input_path)
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest == cached_digest and os.path.exists(output_path):
+            return None, digest, True
+        generate_footprint_file(_loads(raw), output_path)
+    except Exception as e:
+        return str(e), digest, False
+    return None, digest, False
 
 
 def main():
+    # Only the command line needs these; importing them here keeps
+    # "from coil_to_footprint import generate_footprint_file" cheap
+    import argparse
+    from concurrent.futures import ProcessPoolExecutor
+
     parser = argparse.ArgumentParser(description='Convert coil JSON files to KiCad footprint files')
     parser.add_argument('input', help='Input coil JSON file, or a directory when using --batch')
     parser.add_argument('output', nargs='?', help='Output footprint file (.kicad_mod) or directory (optional, defaults to coil_footprints/)')
     parser.add_argument('--batch', action='store_true', help='Process all files in a directory')
+    parser.add_argument('--force', action='store_true', help='With --batch, regenerate footprints even if their JSON is unchanged')
 
     args = parser.parse_args()
     
@@ -163,51 +396,68 @@ def main():
             print("Error: Input must be a directory when using --batch")
             sys.exit(1)
 
-        total_converted = 0
-
-        # Walk through input dir: process JSON files at top level and in project subfolders
-        for entry in sorted(os.listdir(args.input)):
-            entry_path = os.path.join(args.input, entry)
-
-            if os.path.isfile(entry_path) and entry.endswith('.json'):
+        # Walk through input dir: collect JSON files at top level and in project subfolders
+        cache_path = os.path.join(os.getcwd(), "coil_footprints", _BATCH_CACHE_FILENAME)
+        cache = {} if args.force else _load_batch_cache(cache_path)
+        tasks = []    # (input_path, output_path, cached_digest) handed to the worker processes
+        reports = []  # (indent, json_file, cache key = footprint path under coil_footprints/)
+        headers = {}  # task index -> project banner printed before that task
+        # scandir() entries answer is_file()/is_dir() from the directory
+        # listing itself, so no extra stat() per entry is needed
+        with os.scandir(args.input) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        top_level = _unique_by_footprint([e for e in entries if e.is_file() and is_coil_file(e.name)])
+        top_level_names = {e.name for e in top_level}
+        for entry in entries:
+            if entry.is_file() and entry.name in top_level_names:
                 # JSON directly in coil_json/ (no project subfolder)
                 output_dir = ensure_coil_footprints_directory()
-                output_filename = os.path.splitext(entry)[0] + '.kicad_mod'
-                output_path = os.path.join(output_dir, output_filename)
-                try:
-                    with open(entry_path, 'r') as f:
-                        coil_data = json.load(f)
-                    generate_footprint_file(coil_data, output_path)
-                    print(f"Converted: {entry} -> coil_footprints/{output_filename}")
-                    total_converted += 1
-                except Exception as e:
-                    print(f"Error processing {entry}: {str(e)}")
+                output_filename = footprint_filename(entry.name)
+                tasks.append((entry.path, os.path.join(output_dir, output_filename), cache.get(output_filename)))
+                reports.append(("", entry.name, output_filename))
 
-            elif os.path.isdir(entry_path):
+            elif entry.is_dir():
                 # Project subfolder
-                project_name = entry
-                json_files = [f for f in os.listdir(entry_path) if f.endswith('.json')]
+                project_name = entry.name
+                with os.scandir(entry.path) as it:
+                    json_files = sorted((e for e in it if is_coil_file(e.name)), key=lambda e: e.name)
+                json_files = _unique_by_footprint(json_files, indent="  ")
                 if not json_files:
                     continue
                 output_dir = ensure_coil_footprints_directory(project_name)
-                print(f"Processing project: {project_name}/ ({len(json_files)} files)")
-                for json_file in sorted(json_files):
-                    input_path = os.path.join(entry_path, json_file)
-                    output_filename = os.path.splitext(json_file)[0] + '.kicad_mod'
-                    output_path = os.path.join(output_dir, output_filename)
-                    try:
-                        with open(input_path, 'r') as f:
-                            coil_data = json.load(f)
-                        generate_footprint_file(coil_data, output_path)
-                        print(f"  Converted: {json_file} -> coil_footprints/{project_name}/{output_filename}")
-                        total_converted += 1
-                    except Exception as e:
-                        print(f"  Error processing {json_file}: {str(e)}")
-
-        if total_converted == 0:
+                headers[len(tasks)] = f"Processing project: {project_name}/ ({len(json_files)} files)"
+                for json_file in json_files:
+                    output_filename = footprint_filename(json_file.name)
+                    key = f"{project_name}/{output_filename}"
+                    tasks.append((json_file.path, os.path.join(output_dir, output_filename), cache.get(key)))
+                    reports.append(("  ", json_file.name, key))
+
+        # Each file is independent, so convert them across all cores. map()
+        # keeps the results in submission order for the progress log.
+        total_converted = 0
+        total_unchanged = 0
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(_convert_one, tasks, chunksize=8)
+            for i, ((error, digest, unchanged), (indent, json_file, key)) in enumerate(zip(results, reports)):
+                if i in headers:
+                    print(headers[i])
+                if error is not None:
+                    print(f"{indent}Error processing {json_file}: {error}")
+                    cache.pop(key, None)
+                    continue
+                cache[key] = digest
+                if unchanged:
+                    print(f"{indent}Unchanged: {json_file} -> coil_footprints/{key}")
+                    total_unchanged += 1
+                else:
+                    print(f"{indent}Converted: {json_file} -> coil_footprints/{key}")
+                    total_converted += 1
+
+        if total_converted + total_unchanged == 0:
             print(f"No JSON files found in {args.input}/")
             sys.exit(1)
-        print(f"\nConverted {total_converted} file(s) total.")
+        _save_batch_cache(cache_path, cache)
+        print(f"\nConverted {total_converted} file(s) total, {total_unchanged} unchanged.")
 
     else:
         # Single file processing
@@ -216,8 +466,7 @@ def main():
             sys.exit(1)
 
         try:
-            with open(args.input, 'r') as f:
-                coil_data = json.load(f)
+            coil_data = _loads(_read_coil_bytes(args.input))
 
             # Determine output path
             if args.output:
@@ -225,7 +474,7 @@ def main():
             else:
                 # Infer project subfolder if input is coil_json/<project>/<file>.json
                 input_filename = os.path.basename(args.input)
-                output_filename = os.path.splitext(input_filename)[0] + '.kicad_mod'
+                output_filename = footprint_filename(input_filename)
                 parent_dir = os.path.basename(os.path.dirname(args.input))
                 grandparent_dir = os.path.basename(os.path.dirname(os.path.dirname(args.input)))
                 if grandparent_dir == "coil_json":
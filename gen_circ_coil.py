@@ -1,20 +1,71 @@
-import matplotlib.pyplot as plt
-import json
 import numpy as np
 import os
-from coil_to_footprint import generate_footprint_file, ensure_coil_footprints_directory
+import coil_drc
+from coil_fs import ensure_coil_footprints_directory, ensure_coil_json_directory
+from coil_to_footprint import generate_footprint_file, write_coil_json
+from helpers import unit_phasors
 
 
-def ensure_coil_json_directory(project_name):
-    """Ensure the coil_json/<project_name> directory exists, create it if it doesn't"""
-    coil_json_dir = os.path.join(os.getcwd(), "coil_json", project_name)
-    if not os.path.exists(coil_json_dir):
-        os.makedirs(coil_json_dir)
-        print(f"Created coil_json directory: {coil_json_dir}")
-    return coil_json_dir
+def compute_spiral(center_x, center_y, initial_radius, turns, spacing):
+    """
+    Compute the points of a circular spiral with continuous angle progression.
+
+    Args:
+        center_x (float): X-coordinate of the coil's center.
+        center_y (float): Y-coordinate of the coil's center.
+        initial_radius (float): Radius of the initial circle.
+        turns (int): Number of circular turns.
+        spacing (float): Spacing between consecutive turns.
+
+    Returns:
+        tuple: (x_coords, y_coords) NumPy arrays, inner end first.
+    """
+    x_coords, y_coords = compute_spirals(center_x, center_y, initial_radius, turns, spacing)
+    return x_coords[0], y_coords[0]
+
+
+def compute_spirals(center_x, center_y, initial_radius, turns, spacing):
+    """
+    Compute many circular spirals in one pass, e.g. for a sweep over a parameter grid.
 
+    Each argument is a scalar or a 1-D array; they are broadcast against each
+    other to M coils. Coils with the same number of turns share a single
+    cos/sin evaluation.
 
-def plot_circular_coil(center_x, center_y, initial_radius, turns, spacing):
+    Args:
+        center_x (float or array): X-coordinates of the coils' centers.
+        center_y (float or array): Y-coordinates of the coils' centers.
+        initial_radius (float or array): Radii of the initial circles.
+        turns (int or array): Numbers of circular turns.
+        spacing (float or array): Spacings between consecutive turns.
+
+    Returns:
+        tuple: (x_coords, y_coords) NumPy arrays of shape (M, 5000), one row
+        per coil, inner end first.
+    """
+    center_x, center_y, initial_radius, turns, spacing = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (center_x, center_y, initial_radius, turns, spacing))
+    )
+    num_points = 5000
+    x_coords = np.empty((len(turns), num_points))
+    y_coords = np.empty((len(turns), num_points))
+
+    for coil_turns in np.unique(turns):
+        rows = turns == coil_turns
+        max_theta = 2 * np.pi * coil_turns  # Total angle for the number of turns
+        theta_values = np.linspace(0, max_theta, num=num_points)  # Smooth continuous angles
+
+        # cos/sin of every angle in one pass; the rounding error (~1e-14) is
+        # far below anything a PCB can resolve
+        phasor = unit_phasors(max_theta, num_points)
+
+        radius = initial_radius[rows, None] + (spacing[rows, None] * theta_values / (2 * np.pi))  # Smoothly increase radius
+        x_coords[rows] = center_x[rows, None] + radius * phasor.real
+        y_coords[rows] = center_y[rows, None] + radius * phasor.imag
+    return x_coords, y_coords
+
+
+def plot_circular_coil(center_x, center_y, initial_radius, turns, spacing, spiral=None):
     """
     Plot a circular spiral coil using Matplotlib with continuous angle progression.
 
@@ -24,27 +75,23 @@ def plot_circular_coil(center_x, center_y, initial_radius, turns, spacing):
         initial_radius (float): Radius of the initial circle.
         turns (int): Number of circular turns.
         spacing (float): Spacing between consecutive turns.
+        spiral (tuple): Precomputed (x_coords, y_coords) from compute_spiral. If None, computed here.
 
     Returns:
         None
     """
+    # Imported here so JSON-only runs never load matplotlib or a GUI backend
+    import matplotlib.pyplot as plt
+
     # Initialize the plot
     fig, ax = plt.subplots(figsize=(6, 6))
 
-    # Initialize the coil points
-    points = []
-    max_theta = 2 * np.pi * turns  # Total angle for the number of turns
-    theta_values = np.linspace(0, max_theta, num=5000)  # Smooth continuous angles
-
     # Generate the circular spiral
-    for theta in theta_values:
-        radius = initial_radius + (spacing * theta / (2 * np.pi))  # Smoothly increase radius
-        x = center_x + radius * np.cos(theta)
-        y = center_y + radius * np.sin(theta)
-        points.append((x, y))
+    if spiral is None:
+        spiral = compute_spiral(center_x, center_y, initial_radius, turns, spacing)
+    x_coords, y_coords = spiral
 
     # Plot the spiral
-    x_coords, y_coords = zip(*points)
     ax.plot(x_coords, y_coords, 'b-', linewidth=2)
 
     # Add labels and set aspect ratio
@@ -58,7 +105,7 @@ def plot_circular_coil(center_x, center_y, initial_radius, turns, spacing):
     plt.show()
 
 
-def generate_coil_json(center_x, center_y, initial_radius, turns, spacing, track_width=0.15, filename=None, project_name="default"):
+def generate_coil_json(center_x, center_y, initial_radius, turns, spacing, track_width=0.15, filename=None, project_name="default", spiral=None, interactive=True, auto_save=False, auto_footprint=False):
     """
     Generate a JSON file for a circular coil compatible with the KiCad plugin.
 
@@ -70,75 +117,40 @@ def generate_coil_json(center_x, center_y, initial_radius, turns, spacing, track
         spacing (float): Spacing between consecutive turns.
         track_width (float): Width of the track in mm.
         filename (str): Name of the JSON file to save. If None, auto-generated.
+        project_name (str): Subfolder of coil_json/ to save into.
+        spiral (tuple): Precomputed (x_coords, y_coords) from compute_spiral. If None, computed here.
+        interactive (bool): Ask before saving the JSON and before generating the footprint.
+        auto_save (bool): With interactive=False, save the JSON without asking.
+        auto_footprint (bool): With interactive=False, also generate the footprint after saving.
 
     Returns:
         None
     """
-    # Initialize the coil points
-    points = []
-    max_theta = 2 * np.pi * turns  # Total angle for the number of turns
-    theta_values = np.linspace(0, max_theta, num=5000)  # Smooth continuous angles
-
-    # Generate the circular spiral coordinates
-    for theta in theta_values:
-        radius = initial_radius + (spacing * theta / (2 * np.pi))  # Smoothly increase radius
-        x = center_x + radius * np.cos(theta)
-        y = center_y + radius * np.sin(theta)
-        points.append({"x": x, "y": y})
-
     # DRC checks against manufacturer constraints
-    via_hole_diameter = 0.3   # mm
-    via_hole_to_track = 0.2   # mm (via hole edge to track edge)
-    same_net_spacing = 0.15   # mm (track edge to track edge, trace coils)
-    min_track_width = 0.15    # mm (trace coil min width)
-
-    errors = []
-
-    # Via hole to track: center to first trace must fit via hole + clearance
-    min_inner_radius = via_hole_diameter / 2 + via_hole_to_track + track_width / 2
-    if initial_radius < min_inner_radius:
-        errors.append(
-            f"Inner clearance too small for via.\n"
-            f"  Inner radius: {initial_radius:.3f} mm\n"
-            f"  Minimum required: {min_inner_radius:.3f} mm  "
-            f"(via_hole/2={via_hole_diameter/2} + hole_to_track={via_hole_to_track} + track_width/2={track_width/2})"
-        )
-
-    # Same-net track spacing
-    track_gap = spacing - track_width
-    if track_gap < same_net_spacing:
-        errors.append(
-            f"Same-net track spacing too small.\n"
-            f"  Track gap (spacing - track_width): {track_gap:.3f} mm\n"
-            f"  Minimum required: {same_net_spacing} mm"
-        )
+    coil_drc.report(coil_drc.check_radial(initial_radius, track_width, spacing))
 
-    # Minimum track width check
-    if track_width < min_track_width:
-        errors.append(
-            f"Track width too small.\n"
-            f"  Track width: {track_width} mm\n"
-            f"  Minimum required: {min_track_width} mm"
-        )
-
-    if errors:
-        print("ERROR: DRC violations detected:")
-        for i, e in enumerate(errors, 1):
-            print(f"  [{i}] {e}")
-        print("  Fix parameters before generating the coil.")
-
-    # Prepend center point so the front trace runs from the via to the spiral
-    points.insert(0, {"x": center_x, "y": center_y})
+    # Generate the circular spiral coordinates
+    if spiral is None:
+        spiral = compute_spiral(center_x, center_y, initial_radius, turns, spacing)
+    x_coords, y_coords = spiral
+
+    # Front track as an (N, 2) array with the center point prepended so the
+    # trace runs from the via to the spiral. Points stay in NumPy and only
+    # become {"x", "y"} dicts when the JSON is written.
+    points = np.empty((len(x_coords) + 1, 2))
+    points[0] = center_x, center_y
+    points[1:, 0] = x_coords
+    points[1:, 1] = y_coords
 
     # Back layer: mirror in X and reverse point order so current flows from
     # via outward in the same winding sense as the front (both layers produce
     # B-field in the same direction by the right-hand rule).
-    back_points = [{"x": -p["x"], "y": p["y"]} for p in reversed(points)]
+    back_points = points[::-1] * (-1, 1)
 
     # Front outer pad at the end of the front spiral; back outer pad at the
     # start of the back trace (the X-mirrored front outer end).
-    pad_front = points[-1]
-    pad_back = back_points[0]
+    pad_front = points[-1].tolist()
+    pad_back = back_points[0].tolist()
 
     via_outer_diameter = 0.4   # mm
     via_drill_diameter = 0.3   # mm
@@ -161,8 +173,8 @@ def generate_coil_json(center_x, center_y, initial_radius, turns, spacing, track
             {"x": center_x, "y": center_y, "net": ""}
         ],
         "pads": [
-            {"x": pad_front["x"], "y": pad_front["y"], "width": track_width, "height": track_width, "layer": "f", "angle": 0, "net": "", "clearance": 0.1},
-            {"x": pad_back["x"],  "y": pad_back["y"],  "width": track_width, "height": track_width, "layer": "b", "angle": 0, "net": "", "clearance": 0.1}
+            {"x": pad_front[0], "y": pad_front[1], "width": track_width, "height": track_width, "layer": "f", "angle": 0, "net": "", "clearance": 0.1},
+            {"x": pad_back[0],  "y": pad_back[1],  "width": track_width, "height": track_width, "layer": "b", "angle": 0, "net": "", "clearance": 0.1}
         ],
         "silk": [],
         "edgeCuts": [],
@@ -188,16 +200,21 @@ def generate_coil_json(center_x, center_y, initial_radius, turns, spacing, track
     coil_json_dir = ensure_coil_json_directory(project_name)
     file_path = os.path.join(coil_json_dir, filename)
 
-    # Prompt user before saving
-    save = input(f"Save to coil_json/{project_name}/{filename}? (y/n): ").strip().lower()
-    if save == 'y':
-        with open(file_path, 'w') as json_file:
-            json.dump(json_data, json_file, indent=4)
+    # Prompt user before saving, or follow auto_save in non-interactive runs
+    if interactive:
+        save = input(f"Save to coil_json/{project_name}/{filename}? (y/n): ").strip().lower() == 'y'
+    else:
+        save = auto_save
+    if save:
+        write_coil_json(json_data, file_path)
         print(f"Coil JSON saved to coil_json/{project_name}/{filename}")
 
         # Optionally generate footprint immediately
-        gen_fp = input("Generate footprint (.kicad_mod) now? (y/n): ").strip().lower()
-        if gen_fp == 'y':
+        if interactive:
+            gen_fp = input("Generate footprint (.kicad_mod) now? (y/n): ").strip().lower() == 'y'
+        else:
+            gen_fp = auto_footprint
+        if gen_fp:
             fp_dir = ensure_coil_footprints_directory(project_name)
             fp_filename = os.path.splitext(filename)[0] + '.kicad_mod'
             fp_path = os.path.join(fp_dir, fp_filename)
@@ -207,17 +224,78 @@ def generate_coil_json(center_x, center_y, initial_radius, turns, spacing, track
         print("Skipped saving.")
 
 
+# Keyword arguments every batch coil starts from; a config may override them
+_BATCH_DEFAULTS = {"interactive": False, "auto_save": True, "auto_footprint": True}
+
+
+def _generate_from_config(config):
+    """Batch worker: save one coil and its footprint without prompting"""
+    generate_coil_json(**{**_BATCH_DEFAULTS, **config})
+
+
+def generate_batch(configs, max_workers=None):
+    """
+    Generate many circular coils, e.g. a sweep over a parameter grid.
+
+    The spirals of all coils are computed up front in one compute_spirals
+    call, so coils with the same number of turns share a single cos/sin
+    evaluation. The JSON files and footprints are then written in parallel,
+    one worker process per CPU, without prompting.
+
+    Args:
+        configs (list): Keyword-argument dicts for generate_coil_json.
+            Values here override the batch defaults (no prompts, save the JSON
+            and footprint).
+        max_workers (int): Number of worker processes. If None, one per CPU.
+
+    Returns:
+        None
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    configs = list(configs)
+    if not configs:
+        return
+    x_coords, y_coords = compute_spirals(
+        *(np.array([config[key] for config in configs], dtype=float)
+          for key in ("center_x", "center_y", "initial_radius", "turns", "spacing"))
+    )
+    jobs = [{"spiral": (x_coords[i], y_coords[i]), **config} for i, config in enumerate(configs)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Consume the results so worker exceptions are raised here
+        for _ in executor.map(_generate_from_config, jobs, chunksize=8):
+            pass
+
+
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a circular spiral coil JSON for KiCad')
+    parser.add_argument('--plot', action='store_true', help='Show a matplotlib preview of the coil')
+    parser.add_argument('--yes', action='store_true', help='Save the JSON and footprint without prompting')
+    args = parser.parse_args()
+
     coil = {"center_x": 0, "center_y": 0, "initial_radius": 0.4, "turns": 4, "spacing": 0.3, "track_width": 0.15, "project_name": "small_scale_designs"}
 
-    show_plot = False
+    # Compute the spiral once and share it between the plot and the JSON export
+    spiral = compute_spiral(
+        center_x=coil["center_x"],
+        center_y=coil["center_y"],
+        initial_radius=coil["initial_radius"],
+        turns=coil["turns"],
+        spacing=coil["spacing"]
+    )
+
+    show_plot = args.plot
     if show_plot:
         plot_circular_coil(
             center_x=coil["center_x"],
             center_y=coil["center_y"],
             initial_radius=coil["initial_radius"],
             turns=coil["turns"],
-            spacing=coil["spacing"]
+            spacing=coil["spacing"],
+            spiral=spiral
         )
 
     save_json_file = True
@@ -229,7 +307,11 @@ def main():
             turns=coil["turns"],
             spacing=coil["spacing"],
             track_width=coil["track_width"],
-            project_name=coil["project_name"]
+            project_name=coil["project_name"],
+            spiral=spiral,
+            interactive=not args.yes,
+            auto_save=True,
+            auto_footprint=True
         )
 
 if __name__ == '__main__':
@@ -1,21 +1,81 @@
-import matplotlib.pyplot as plt
-import json
 import math
 import numpy as np
 import os
-from coil_to_footprint import generate_footprint_file, ensure_coil_footprints_directory
+import coil_drc
+from coil_fs import ensure_coil_footprints_directory, ensure_coil_json_directory
+from coil_to_footprint import generate_footprint_file, write_coil_json
+from helpers import unit_phasors
 
+# Maximum deviation (sagitta) allowed between the sampled polyline and the
+# true spiral. 0.1 um is one unit of the 4-decimal footprint output, so a
+# finer sampling would not change the generated footprint.
+SAGITTA_TOLERANCE_MM = 0.0001
 
-def ensure_coil_json_directory(project_name):
-    """Ensure the coil_json/<project_name> directory exists, create it if it doesn't"""
-    coil_json_dir = os.path.join(os.getcwd(), "coil_json", project_name)
-    if not os.path.exists(coil_json_dir):
-        os.makedirs(coil_json_dir)
-        print(f"Created coil_json directory: {coil_json_dir}")
-    return coil_json_dir
+# Upper bound on the automatic sampling, the fixed density used before the
+# count was derived from the tolerance
+MAX_SAMPLES_PER_TURN = 1000
 
 
-def plot_elliptical_coil(center_x, center_y, initial_radius_x, initial_radius_y, turns, spacing):
+def spiral_sample_count(initial_radius_x, initial_radius_y, turns, spacing, samples_per_turn=None):
+    """
+    Number of points needed to sample the elliptical spiral within SAGITTA_TOLERANCE_MM.
+
+    The points are evenly spaced in the parameter theta of
+    (a cos theta, b sin theta), with a and b growing by spacing / (2 pi) per
+    radian. A chord spanning dtheta deviates from the curve by at most
+    |d^2 p / dtheta^2| * dtheta^2 / 8. That second derivative is bounded by
+    the larger semi-axis a plus spacing / pi from the growth, so solving
+    (a + spacing / pi) * dtheta^2 / 8 = tolerance on the outer turn, where a
+    is largest, gives the step.
+    The count is capped at MAX_SAMPLES_PER_TURN per turn, so very large coils
+    may exceed the tolerance. Passing samples_per_turn uses exactly that many
+    points per turn instead.
+    """
+    if samples_per_turn is not None:
+        return max(2, int(samples_per_turn * turns))
+    outer_a = max(initial_radius_x, initial_radius_y) + spacing * turns
+    max_second_derivative = outer_a + spacing / math.pi
+    theta_step = math.sqrt(8 * SAGITTA_TOLERANCE_MM / max(max_second_derivative, SAGITTA_TOLERANCE_MM))
+    num_points = int(math.ceil(2 * math.pi * turns / theta_step)) + 1
+    return max(2, min(num_points, int(MAX_SAMPLES_PER_TURN * turns)))
+
+
+def compute_spiral(center_x, center_y, initial_radius_x, initial_radius_y, turns, spacing, samples_per_turn=None):
+    """
+    Compute the points of an elliptical spiral.
+
+    Args:
+        center_x (float): X-coordinate of the coil's center.
+        center_y (float): Y-coordinate of the coil's center.
+        initial_radius_x (float): Initial radius along the x-axis.
+        initial_radius_y (float): Initial radius along the y-axis.
+        turns (int): Number of turns in the spiral.
+        spacing (float): Spacing between consecutive turns.
+        samples_per_turn (int): Points per turn. If None, sized from SAGITTA_TOLERANCE_MM.
+
+    Returns:
+        tuple: (x, y) NumPy arrays, inner end first.
+    """
+    theta_max = 2 * math.pi * turns
+    num_points = spiral_sample_count(initial_radius_x, initial_radius_y, turns, spacing, samples_per_turn)
+
+    # Radii increase with spacing; spacing * theta / (2 * pi) grows linearly
+    # from 0 to spacing * turns and is shared by both axes
+    dr = np.linspace(0, spacing * turns, num=num_points)
+
+    # Elliptical coordinates, with cos/sin taken from one fused phasor pass.
+    # Each axis is built in place in a single buffer to avoid temporaries.
+    phasor = unit_phasors(theta_max, num_points)
+    x = np.add(dr, initial_radius_x)
+    np.multiply(x, phasor.real, out=x)
+    np.add(x, center_x, out=x)
+    y = np.add(dr, initial_radius_y, out=dr)
+    np.multiply(y, phasor.imag, out=y)
+    np.subtract(center_y, y, out=y)
+    return x, y
+
+
+def plot_elliptical_coil(center_x, center_y, initial_radius_x, initial_radius_y, turns, spacing, samples_per_turn=None, spiral=None):
     """
     Plot an elliptical spiral coil using Matplotlib.
 
@@ -26,24 +86,22 @@ def plot_elliptical_coil(center_x, center_y, initial_radius_x, initial_radius_y,
         initial_radius_y (float): Initial radius along the y-axis.
         turns (int): Number of turns in the spiral.
         spacing (float): Spacing between consecutive turns.
+        samples_per_turn (int): Points per turn. If None, sized from SAGITTA_TOLERANCE_MM.
+        spiral (tuple): Precomputed (x, y) from compute_spiral. If None, computed here.
 
     Returns:
         None
     """
+    # Imported here so JSON-only runs never load matplotlib or a GUI backend
+    import matplotlib.pyplot as plt
+
     # Initialize the plot
     fig, ax = plt.subplots(figsize=(6, 6))
 
     # Generate the elliptical spiral
-    theta_max = 2 * math.pi * turns
-    theta = np.linspace(0, theta_max, num=1000 * turns)  # Adjust num points for smoothness
-    # theta = theta * -1
-    # Radii increase with spacing
-    r_x = initial_radius_x + (spacing * theta) / (2 * math.pi)
-    r_y = initial_radius_y + (spacing * theta) / (2 * math.pi)
-
-    # Elliptical coordinates
-    x = center_x + r_x * np.cos(theta)
-    y = center_y - r_y * np.sin(theta)
+    if spiral is None:
+        spiral = compute_spiral(center_x, center_y, initial_radius_x, initial_radius_y, turns, spacing, samples_per_turn)
+    x, y = spiral
 
     # Plot the spiral
     ax.plot(x, y, 'b-', linewidth=2)
@@ -59,7 +117,7 @@ def plot_elliptical_coil(center_x, center_y, initial_radius_x, initial_radius_y,
     plt.show()
 
 
-def generate_coil_json(center_x, center_y, initial_radius_x, initial_radius_y, turns, spacing, track_width=0.1, filename=None, project_name="default"):
+def generate_coil_json(center_x, center_y, initial_radius_x, initial_radius_y, turns, spacing, track_width=0.1, filename=None, project_name="default", samples_per_turn=None, spiral=None, interactive=True, auto_save=False, auto_footprint=False):
     """
     Generate a JSON file for an elliptical coil compatible with the KiCad plugin.
 
@@ -72,72 +130,36 @@ def generate_coil_json(center_x, center_y, initial_radius_x, initial_radius_y, t
         spacing (float): Spacing between consecutive turns.
         track_width (float): Width of the track in mm.
         filename (str): Name of the JSON file to save. If None, auto-generated.
+        samples_per_turn (int): Points per turn. If None, sized from SAGITTA_TOLERANCE_MM.
+        spiral (tuple): Precomputed (x, y) from compute_spiral. If None, computed here.
+        interactive (bool): Ask before saving the JSON and before generating the footprint.
+        auto_save (bool): With interactive=False, save the JSON without asking.
+        auto_footprint (bool): With interactive=False, also generate the footprint after saving.
 
     Returns:
         None
     """
-    # Generate the elliptical spiral coordinates
-    theta_max = 2 * math.pi * turns
-    theta = np.linspace(0, theta_max, num=1000 * turns)
-    # theta = theta * -1a.
-    # Radii increase with spacing
-    r_x = initial_radius_x + (spacing * theta) / (2 * math.pi)
-    r_y = initial_radius_y + (spacing * theta) / (2 * math.pi)
-
-    # Elliptical coordinates
-    x = center_x + r_x * np.cos(theta)
-    y = center_y - r_y * np.sin(theta)
-
-    # Prepare points for JSON (spiral only, inner to outer)
-    points = [{"x": float(xi), "y": float(yi)} for xi, yi in zip(x, y)]
-
     # DRC checks against manufacturer constraints
-    via_hole_diameter = 0.3   # mm
-    via_hole_to_track = 0.2   # mm (via hole edge to track edge)
-    same_net_spacing = 0.15   # mm (track edge to track edge, trace coils)
-    min_track_width = 0.15    # mm (trace coil min width)
-
-    errors = []
-
-    # Via hole to track: center to nearest trace must fit via hole + clearance
     min_inner_radius = min(initial_radius_x, initial_radius_y)
-    min_required = via_hole_diameter / 2 + via_hole_to_track + track_width / 2
-    if min_inner_radius < min_required:
-        errors.append(
-            f"Inner clearance too small for via.\n"
-            f"  Min inner radius: {min_inner_radius:.3f} mm\n"
-            f"  Minimum required: {min_required:.3f} mm  "
-            f"(via_hole/2={via_hole_diameter/2} + hole_to_track={via_hole_to_track} + track_width/2={track_width/2})"
-        )
+    coil_drc.report(coil_drc.check_radial(min_inner_radius, track_width, spacing, radius_label="Min inner radius"))
 
-    # Same-net track spacing
-    track_gap = spacing - track_width
-    if track_gap < same_net_spacing:
-        errors.append(
-            f"Same-net track spacing too small.\n"
-            f"  Track gap (spacing - track_width): {track_gap:.3f} mm\n"
-            f"  Minimum required: {same_net_spacing} mm"
-        )
-
-    # Minimum track width check
-    if track_width < min_track_width:
-        errors.append(
-            f"Track width too small.\n"
-            f"  Track width: {track_width} mm\n"
-            f"  Minimum required: {min_track_width} mm"
-        )
-
-    if errors:
-        print("ERROR: DRC violations detected:")
-        for i, e in enumerate(errors, 1):
-            print(f"  [{i}] {e}")
-        print("  Fix parameters before generating the coil.")
-
-    # Prepend center point so front trace runs from via through spiral to outer pad
-    points.insert(0, {"x": float(center_x), "y": float(center_y)})
+    # Generate the elliptical spiral coordinates
+    if spiral is None:
+        spiral = compute_spiral(center_x, center_y, initial_radius_x, initial_radius_y, turns, spacing, samples_per_turn)
+    x, y = spiral
+
+    # Front track as an (N, 2) array with the center point prepended so the
+    # trace runs from the via through the spiral to the outer pad. Points stay
+    # in NumPy and only become {"x", "y"} dicts when the JSON is written.
+    points = np.empty((len(x) + 1, 2))
+    points[0] = center_x, center_y
+    points[1:, 0] = x
+    points[1:, 1] = y
 
     # Back layer: mirror in X and reverse so trace runs from mirrored outer end to via
-    back_points = [{"x": -p["x"], "y": p["y"]} for p in reversed(points)]
+    back_points = points[::-1] * (-1, 1)
+    pad_front = points[-1].tolist()
+    pad_back = back_points[0].tolist()
 
     # Prepare the JSON data
     json_data = {
@@ -163,16 +185,16 @@ def generate_coil_json(center_x, center_y, initial_radius_x, initial_radius_y, t
         ],
         "pads": [
             {
-                "x": points[-1]["x"],
-                "y": points[-1]["y"],
+                "x": pad_front[0],
+                "y": pad_front[1],
                 "width": track_width,
                 "height": track_width,
                 "clearance": 0.1,
                 "layer": "f"
             },
             {
-                "x": back_points[0]["x"],
-                "y": back_points[0]["y"],
+                "x": pad_back[0],
+                "y": pad_back[1],
                 "width": track_width,
                 "height": track_width,
                 "clearance": 0.1,
@@ -204,16 +226,21 @@ def generate_coil_json(center_x, center_y, initial_radius_x, initial_radius_y, t
     coil_json_dir = ensure_coil_json_directory(project_name)
     file_path = os.path.join(coil_json_dir, filename)
 
-    # Prompt user before saving
-    save = input(f"Save to coil_json/{project_name}/{filename}? (y/n): ").strip().lower()
-    if save == 'y':
-        with open(file_path, 'w') as json_file:
-            json.dump(json_data, json_file, indent=4)
+    # Prompt user before saving, or follow auto_save in non-interactive runs
+    if interactive:
+        save = input(f"Save to coil_json/{project_name}/{filename}? (y/n): ").strip().lower() == 'y'
+    else:
+        save = auto_save
+    if save:
+        write_coil_json(json_data, file_path)
         print(f"Coil JSON saved to coil_json/{project_name}/{filename}")
 
         # Optionally generate footprint immediately
-        gen_fp = input("Generate footprint (.kicad_mod) now? (y/n): ").strip().lower()
-        if gen_fp == 'y':
+        if interactive:
+            gen_fp = input("Generate footprint (.kicad_mod) now? (y/n): ").strip().lower() == 'y'
+        else:
+            gen_fp = auto_footprint
+        if gen_fp:
             fp_dir = ensure_coil_footprints_directory(project_name)
             fp_filename = os.path.splitext(filename)[0] + '.kicad_mod'
             fp_path = os.path.join(fp_dir, fp_filename)
@@ -224,6 +251,12 @@ def generate_coil_json(center_x, center_y, initial_radius_x, initial_radius_y, t
 
 
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate an elliptical spiral coil JSON for KiCad')
+    parser.add_argument('--yes', action='store_true', help='Save the JSON and footprint without prompting')
+    args = parser.parse_args()
+
     coil = {
         "center_x": 0,
         "center_y": 0,
@@ -235,6 +268,16 @@ def main():
         "project_name": "small_scale_designs"
     }
 
+    # Compute the spiral once and share it between the plot and the JSON export
+    spiral = compute_spiral(
+        center_x=coil["center_x"],
+        center_y=coil["center_y"],
+        initial_radius_x=coil["initial_radius_x"],
+        initial_radius_y=coil["initial_radius_y"],
+        turns=coil["turns"],
+        spacing=coil["spacing"]
+    )
+
     show_plot = True
     if show_plot:
         plot_elliptical_coil(
@@ -243,7 +286,8 @@ def main():
             initial_radius_x=coil["initial_radius_x"],
             initial_radius_y=coil["initial_radius_y"],
             turns=coil["turns"],
-            spacing=coil["spacing"]
+            spacing=coil["spacing"],
+            spiral=spiral
         )
 
     save_json_file = True
@@ -256,7 +300,11 @@ def main():
             turns=coil["turns"],
             spacing=coil["spacing"],
             track_width=coil["track_width"],
-            project_name=coil["project_name"]
+            project_name=coil["project_name"],
+            spiral=spiral,
+            interactive=not args.yes,
+            auto_save=True,
+            auto_footprint=True
         )
 
 if __name__ == '__main__':
@@ -1,19 +1,50 @@
-import matplotlib.pyplot as plt
-import json
+import numpy as np
 import os
-from coil_to_footprint import generate_footprint_file, ensure_coil_footprints_directory
+import coil_drc
+from coil_fs import ensure_coil_footprints_directory, ensure_coil_json_directory
+from coil_to_footprint import generate_footprint_file, write_coil_json
 
 
-def ensure_coil_json_directory(project_name):
-    """Ensure the coil_json/<project_name> directory exists, create it if it doesn't"""
-    coil_json_dir = os.path.join(os.getcwd(), "coil_json", project_name)
-    if not os.path.exists(coil_json_dir):
-        os.makedirs(coil_json_dir)
-        print(f"Created coil_json directory: {coil_json_dir}")
-    return coil_json_dir
+def compute_spiral(start_x, start_y, initial_width, initial_height, turns, spacing):
+    """
+    Compute the points of a connected spiral-in rectangular coil.
 
+    Args:
+        start_x (float): X-coordinate of the starting point.
+        start_y (float): Y-coordinate of the starting point.
+        initial_width (float): Width of the initial rectangle.
+        initial_height (float): Height of the initial rectangle.
+        turns (int): Number of turns in the spiral.
+        spacing (float): Spacing between consecutive turns.
 
-def plot_rect_coil(start_x, start_y, initial_width, initial_height, turns, spacing):
+    Returns:
+        tuple: (x_coords, y_coords) NumPy arrays of the spiral's corners,
+        outer start point first.
+    """
+    # Steps taken on each turn: right, up, left, down (one step short to
+    # leave room for the inward step), then the inward step to the next turn
+    shrink = 2 * spacing * np.arange(turns)
+    w_steps = np.rint((initial_width - shrink) / spacing).astype(int)
+    h_steps = np.rint((initial_height - shrink) / spacing).astype(int)
+    counts = np.stack([w_steps, h_steps, w_steps, h_steps - 1, np.ones_like(w_steps)], axis=1).clip(min=0).ravel()
+    step_x = np.repeat(np.tile([spacing, 0.0, -spacing, 0.0, spacing], turns), counts)
+    step_y = np.repeat(np.tile([0.0, spacing, 0.0, -spacing, 0.0], turns), counts)
+
+    # Each point is where the trace sits before its step. A running sum
+    # seeded with the start point adds the steps in the same order as
+    # walking the spiral one point at a time.
+    x_coords = np.cumsum(np.concatenate(([start_x], step_x)))[:-1]
+    y_coords = np.cumsum(np.concatenate(([start_y], step_y)))[:-1]
+
+    # Only the corners carry information: drop every point in the middle of
+    # a straight run, i.e. whose incoming and outgoing steps are the same.
+    # The inward step merges with the next turn's first side.
+    keep = np.ones(len(x_coords), dtype=bool)
+    keep[1:-1] = (step_x[1:-1] != step_x[:-2]) | (step_y[1:-1] != step_y[:-2])
+    return x_coords[keep], y_coords[keep]
+
+
+def plot_rect_coil(start_x, start_y, initial_width, initial_height, turns, spacing, save_path=None, show=True, title="Connected Rectangular Spiral Coil"):
     """
     Plot a connected spiral-in rectangular coil using Matplotlib.
 
@@ -24,61 +55,51 @@ def plot_rect_coil(start_x, start_y, initial_width, initial_height, turns, spaci
         initial_height (float): Height of the initial rectangle.
         turns (int): Number of turns in the spiral.
         spacing (float): Spacing between consecutive turns.
+        save_path (str): If set, render the plot to this image file and close it instead of showing it.
+        show (bool): Show the plot in a window when save_path is None.
+        title (str): Plot title.
 
     Returns:
-        None
+        matplotlib.figure.Figure: The plot's figure.
     """
+    # Imported here so JSON-only runs never load matplotlib or a GUI backend.
+    # COILGEN_HEADLESS selects the non-GUI Agg backend for batch previews.
+    import matplotlib
+    if os.environ.get('COILGEN_HEADLESS'):
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     # Initialize the plot
     fig, ax = plt.subplots(figsize=(6, 6))
 
-    # Initialize the coil points
-    points = []
-    current_x, current_y = start_x, start_y
-    current_width, current_height = initial_width, initial_height
-
     # Generate the rectangular spiral
-    for turn in range(turns):
-        w_steps = int(round(current_width / spacing))
-        h_steps = int(round(current_height / spacing))
-        # Right
-        for i in range(w_steps):
-            points.append((current_x, current_y))
-            current_x += spacing
-        # Up
-        for i in range(h_steps):
-            points.append((current_x, current_y))
-            current_y += spacing
-        # Left
-        for i in range(w_steps):
-            points.append((current_x, current_y))
-            current_x -= spacing
-        # Down (one step short to leave room for the inward step)
-        for i in range(h_steps - 1):
-            points.append((current_x, current_y))
-            current_y -= spacing
-        # Step inward to connect to next turn
-        points.append((current_x, current_y))
-        current_x += spacing
-
-        current_width -= 2 * spacing
-        current_height -= 2 * spacing
+    x_coords, y_coords = compute_spiral(start_x, start_y, initial_width, initial_height, turns, spacing)
 
     # Plot the spiral
-    x_coords, y_coords = zip(*points)
     ax.plot(x_coords, y_coords, 'b-', linewidth=2)
 
     # Add labels and set aspect ratio
-    ax.set_title("Connected Rectangular Spiral Coil")
+    ax.set_title(title)
     ax.set_xlabel("X (mm)")
     ax.set_ylabel("Y (mm)")
     ax.set_aspect('equal', 'box')
     ax.grid(True)
 
-    # Show the plot
-    plt.show()
+    # The spiral never leaves its outer rectangle, so fix the limits up
+    # front instead of letting matplotlib autoscale over the data
+    ax.set_xlim(start_x - spacing, start_x + initial_width + spacing)
+    ax.set_ylim(start_y - spacing, start_y + initial_height + spacing)
+
+    # Save the plot for headless runs, otherwise show it
+    if save_path is not None:
+        fig.savefig(save_path, dpi=100)
+        plt.close(fig)
+    elif show:
+        plt.show()
+    return fig
 
 
-def generate_coil_json(start_x, start_y, initial_width, initial_height, turns, spacing, track_width=0.15, filename=None, project_name="default"):
+def generate_coil_json(start_x, start_y, initial_width, initial_height, turns, spacing, track_width=0.15, filename=None, project_name="default", verbose=True, drc=True, interactive=True, auto_save=False, auto_footprint=False):
     """
     Generate a JSON file for a rectangular coil compatible with the KiCad plugin.
 
@@ -91,109 +112,56 @@ def generate_coil_json(start_x, start_y, initial_width, initial_height, turns, s
         spacing (float): Spacing between consecutive turns.
         track_width (float): Width of the track in mm.
         filename (str): Name of the JSON file to save. If None, auto-generated.
+        project_name (str): Subfolder of coil_json/ to save into.
+        verbose (bool): Print the coil dimensions.
+        drc (bool): Check the coil against the manufacturer constraints and print any violations.
+        interactive (bool): Ask before saving the JSON and before generating the footprint.
+        auto_save (bool): With interactive=False, save the JSON without asking.
+        auto_footprint (bool): With interactive=False, also generate the footprint after saving.
 
     Returns:
         None
     """
-    # Initialize the coil points
-    points = []
-    current_x, current_y = start_x, start_y
-    current_width, current_height = initial_width, initial_height
-
     # Generate the rectangular spiral coordinates
-    for turn in range(turns):
-        w_steps = int(round(current_width / spacing))
-        h_steps = int(round(current_height / spacing))
-        # Right
-        for i in range(w_steps):
-            points.append({"x": current_x, "y": current_y})
-            current_x += spacing
-        # Up
-        for i in range(h_steps):
-            points.append({"x": current_x, "y": current_y})
-            current_y += spacing
-        # Left
-        for i in range(w_steps):
-            points.append({"x": current_x, "y": current_y})
-            current_x -= spacing
-        # Down (one step short to leave room for the inward step)
-        for i in range(h_steps - 1):
-            points.append({"x": current_x, "y": current_y})
-            current_y -= spacing
-        # Step inward to connect to next turn
-        points.append({"x": current_x, "y": current_y})
-        current_x += spacing
-
-        current_width -= 2 * spacing
-        current_height -= 2 * spacing
-
-    # DRC checks against manufacturer constraints
-    via_hole_diameter = 0.3   # mm
-    via_hole_to_track = 0.2   # mm (via hole edge to track edge)
-    same_net_spacing = 0.15   # mm (track edge to track edge, trace coils)
-    min_track_width = 0.15    # mm (trace coil min width)
-
-    errors = []
-
-    # Via hole to track: inner open area must fit via hole + clearance
-    min_inner_dim = min(current_width, current_height)
-    min_required = via_hole_diameter + 2 * (via_hole_to_track + track_width / 2)
-    if min_inner_dim < min_required:
-        errors.append(
-            f"Inner clearance too small for via.\n"
-            f"  Innermost open dimensions: {current_width:.3f} x {current_height:.3f} mm\n"
-            f"  Minimum required: {min_required:.3f} mm  "
-            f"(via_hole={via_hole_diameter} + 2*(hole_to_track={via_hole_to_track} + track_width/2={track_width/2}))"
-        )
+    x_coords, y_coords = compute_spiral(start_x, start_y, initial_width, initial_height, turns, spacing)
 
-    # Same-net track spacing
-    track_gap = spacing - track_width
-    if track_gap < same_net_spacing:
-        errors.append(
-            f"Same-net track spacing too small.\n"
-            f"  Track gap (spacing - track_width): {track_gap:.3f} mm\n"
-            f"  Minimum required: {same_net_spacing} mm"
-        )
-
-    # Minimum track width check
-    if track_width < min_track_width:
-        errors.append(
-            f"Track width too small.\n"
-            f"  Track width: {track_width} mm\n"
-            f"  Minimum required: {min_track_width} mm"
-        )
+    # Open area left inside the innermost turn
+    current_width = initial_width - 2 * spacing * turns
+    current_height = initial_height - 2 * spacing * turns
 
-    if errors:
-        print("ERROR: DRC violations detected:")
-        for i, e in enumerate(errors, 1):
-            print(f"  [{i}] {e}")
-        print("  Fix parameters before generating the coil.")
+    # DRC checks against manufacturer constraints
+    if drc:
+        coil_drc.report(coil_drc.check_rectangular(current_width, current_height, track_width, spacing))
 
     # Print final coil dimensions
-    inner_width = initial_width - 2 * spacing * turns
-    inner_height = initial_height - 2 * spacing * turns
-    print(f"\n--- Rectangular Coil Dimensions ---")
-    print(f"  Turns:          {turns}")
-    print(f"  Track width:    {track_width} mm")
-    print(f"  Spacing:        {spacing} mm")
-    print(f"  Outer size:     {initial_width:.3f} x {initial_height:.3f} mm (W x H)")
-    print(f"  Inner size:     {inner_width:.3f} x {inner_height:.3f} mm (W x H)")
-    print(f"  Overall size:   {initial_width:.3f} x {initial_height:.3f} mm")
-    print(f"-----------------------------------\n")
-
-    # Extend the trace from the inner end to the center for the via
+    if verbose:
+        print(f"\n--- Rectangular Coil Dimensions ---")
+        print(f"  Turns:          {turns}")
+        print(f"  Track width:    {track_width} mm")
+        print(f"  Spacing:        {spacing} mm")
+        print(f"  Outer size:     {initial_width:.3f} x {initial_height:.3f} mm (W x H)")
+        print(f"  Inner size:     {current_width:.3f} x {current_height:.3f} mm (W x H)")
+        print(f"  Overall size:   {initial_width:.3f} x {initial_height:.3f} mm")
+        print(f"-----------------------------------\n")
+
+    # Front track as an (N, 2) array, extended from the inner end to the
+    # center for the via. Points stay in NumPy and only become {"x", "y"}
+    # dicts when the JSON is written.
     center_x = start_x + initial_width / 2
     center_y = start_y + initial_height / 2
-    points.append({"x": center_x, "y": center_y})
+    points = np.empty((len(x_coords) + 1, 2))
+    points[:-1, 0] = x_coords
+    points[:-1, 1] = y_coords
+    points[-1] = center_x, center_y
 
     # Back layer: mirror in X and reverse point order so current flows from
     # via outward in the same winding sense as the front (both layers produce
     # B-field in the same direction by the right-hand rule).
-    back_points = [{"x": -p["x"], "y": p["y"]} for p in reversed(points)]
+    back_points = points[::-1] * (-1, 1)
 
     # Front outer pad and back outer pad (X-mirrored)
-    pad_front = points[0]
-    pad_back = back_points[-1]
+    pad_front = points[0].tolist()
+    pad_back = back_points[-1].tolist()
 
     via_outer_diameter = 0.4   # mm
     via_drill_diameter = 0.3   # mm
@@ -216,8 +184,8 @@ def generate_coil_json(start_x, start_y, initial_width, initial_height, turns, s
             {"x": center_x, "y": center_y, "net": ""}
         ],
         "pads": [
-            {"x": pad_front["x"], "y": pad_front["y"], "width": track_width, "height": track_width, "layer": "f", "angle": 0, "net": "", "clearance": 0.1},
-            {"x": pad_back["x"],  "y": pad_back["y"],  "width": track_width, "height": track_width, "layer": "b", "angle": 0, "net": "", "clearance": 0.1}
+            {"x": pad_front[0], "y": pad_front[1], "width": track_width, "height": track_width, "layer": "f", "angle": 0, "net": "", "clearance": 0.1},
+            {"x": pad_back[0],  "y": pad_back[1],  "width": track_width, "height": track_width, "layer": "b", "angle": 0, "net": "", "clearance": 0.1}
         ],
         "silk": [],
         "edgeCuts": [],
@@ -232,16 +200,21 @@ def generate_coil_json(start_x, start_y, initial_width, initial_height, turns, s
     coil_json_dir = ensure_coil_json_directory(project_name)
     file_path = os.path.join(coil_json_dir, filename)
 
-    # Prompt user before saving
-    save = input(f"Save to coil_json/{project_name}/{filename}? (y/n): ").strip().lower()
-    if save == 'y':
-        with open(file_path, 'w') as json_file:
-            json.dump(json_data, json_file, indent=4)
+    # Prompt user before saving, or follow auto_save in non-interactive runs
+    if interactive:
+        save = input(f"Save to coil_json/{project_name}/{filename}? (y/n): ").strip().lower() == 'y'
+    else:
+        save = auto_save
+    if save:
+        write_coil_json(json_data, file_path)
         print(f"Coil JSON saved to coil_json/{project_name}/{filename}")
 
         # Optionally generate footprint immediately
-        gen_fp = input("Generate footprint (.kicad_mod) now? (y/n): ").strip().lower()
-        if gen_fp == 'y':
+        if interactive:
+            gen_fp = input("Generate footprint (.kicad_mod) now? (y/n): ").strip().lower() == 'y'
+        else:
+            gen_fp = auto_footprint
+        if gen_fp:
             fp_dir = ensure_coil_footprints_directory(project_name)
             fp_filename = os.path.splitext(filename)[0] + '.kicad_mod'
             fp_path = os.path.join(fp_dir, fp_filename)
@@ -251,7 +224,48 @@ def generate_coil_json(start_x, start_y, initial_width, initial_height, turns, s
         print("Skipped saving.")
 
 
+# Keyword arguments every batch coil starts from; a config may override them.
+# DRC violations are still printed, only the dimensions are left out.
+_BATCH_DEFAULTS = {"verbose": False, "interactive": False, "auto_save": True, "auto_footprint": True}
+
+
+def _generate_from_config(config):
+    """Batch worker: save one coil and its footprint without prompting"""
+    generate_coil_json(**{**_BATCH_DEFAULTS, **config})
+
+
+def generate_batch(configs, max_workers=None):
+    """
+    Generate many rectangular coils in parallel, one worker process per CPU.
+
+    Each coil is written to its JSON file and footprint without prompting,
+    so a parameter sweep is not serialized behind input() and the file writes.
+
+    Args:
+        configs (list): Keyword-argument dicts for generate_coil_json.
+            Values here override the batch defaults (no prompts, save the JSON
+            and footprint, no dimensions printout).
+        max_workers (int): Number of worker processes. If None, one per CPU.
+
+    Returns:
+        None
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Consume the results so worker exceptions are raised here
+        for _ in executor.map(_generate_from_config, configs, chunksize=8):
+            pass
+
+
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a rectangular spiral coil JSON for KiCad')
+    parser.add_argument('--yes', action='store_true', help='Save the JSON and footprint without prompting')
+    parser.add_argument('--save-plot', metavar='PNG', help='Save the matplotlib preview to an image file instead of showing it')
+    args = parser.parse_args()
+
     initial_width = 4
     initial_height = 3
     coil = {
@@ -266,14 +280,15 @@ def main():
     }
 
     show_plot = False
-    if show_plot:
+    if show_plot or args.save_plot:
         plot_rect_coil(
             start_x=coil["start_x"],
             start_y=coil["start_y"],
             initial_width=coil["initial_width"],
             initial_height=coil["initial_height"],
             turns=coil["turns"],
-            spacing=coil["spacing"]
+            spacing=coil["spacing"],
+            save_path=args.save_plot
         )
 
     save_json_file = True
@@ -286,7 +301,10 @@ def main():
             turns=coil["turns"],
             spacing=coil["spacing"],
             track_width=coil["track_width"],
-            project_name=coil["project_name"]
+            project_name=coil["project_name"],
+            interactive=not args.yes,
+            auto_save=True,
+            auto_footprint=True
         )
 
 if __name__ == '__main__':
@@ -1,20 +1,17 @@
-import matplotlib.pyplot as plt
-import json
 import math
 import numpy as np
 import os
-from coil_to_footprint import generate_footprint_file, ensure_coil_footprints_directory
-
-def ensure_coil_json_directory(project_name):
-    """Ensure the coil_json/<project_name> directory exists, create it if it doesn't"""
-    coil_json_dir = os.path.join(os.getcwd(), "coil_json", project_name)
-    if not os.path.exists(coil_json_dir):
-        os.makedirs(coil_json_dir)
-        print(f"Created coil_json directory: {coil_json_dir}")
-    return coil_json_dir
+import coil_drc
+from coil_fs import ensure_coil_footprints_directory, ensure_coil_json_directory
+from coil_to_footprint import generate_footprint_file, write_coil_json
 
 def distance_btw_points(p1, p2):
-    return math.sqrt((p2[0] - p1[0])**2 + (p2[1] - p1[1])**2)
+    return math.hypot(p2[0] - p1[0], p2[1] - p1[1])
+
+# length of every segment of an (N, 2) point array in one pass
+def segment_lengths(pts):
+    d = np.diff(pts, axis=0)
+    return np.hypot(d[:, 0], d[:, 1])
 
 def generate_star_spiral_points(center_x, center_y, initial_radius, turns, spacing, num_star_points, inner_ratio):
     """
@@ -22,36 +19,44 @@ def generate_star_spiral_points(center_x, center_y, initial_radius, turns, spaci
     Each point advances by pi/num_star_points radians. Tips (even indices) are at
     outer_r, valleys (odd) at inner_r = outer_r * inner_ratio. Both radii grow
     linearly so the spiral expands smoothly turn by turn.
+    All points are computed at once with NumPy; returns an (N, 2) array.
     """
     points_per_star = num_star_points * 2  # 10 for a 5-pointed star
     total_points = turns * points_per_star
-    pts = []
-    for i in range(total_points):
-        frac_turn = i / points_per_star  # 0.0 .. turns-0.1
-        outer_r = initial_radius + spacing * (frac_turn + 1)
-        inner_r = outer_r * inner_ratio
-        r = outer_r if i % 2 == 0 else inner_r
-        angle = i * math.pi / num_star_points + math.radians(18)  # continuous, never wraps; offset 18° so star is upright
-        x = center_x + r * math.cos(angle)
-        y = center_y + r * math.sin(angle)
-        pts.append((x, y))
-    return pts
-
-
-def plot_star_coil(center_x, center_y, initial_radius, turns, spacing, points_per_turn=10, track_width=0.15, inner_ratio=0.60):
+    i = np.arange(total_points)
+    frac_turn = i / points_per_star  # 0.0 .. turns-0.1
+    r = initial_radius + spacing * (frac_turn + 1)  # outer_r
+    r[1::2] *= inner_ratio  # odd points are valleys at inner_r, no per-point select needed
+    # The angle advances by pi/num_star_points per point, so the directions
+    # repeat every points_per_star points: evaluate cos/sin for one star and
+    # broadcast them over the turns instead of once per point
+    angle = np.arange(points_per_star) * math.pi / num_star_points + math.radians(18)  # offset 18° so star is upright
+    r = r.reshape(turns, points_per_star)
+    pts = np.empty((turns, points_per_star, 2))
+    pts[:, :, 0] = center_x + r * np.cos(angle)
+    pts[:, :, 1] = center_y + r * np.sin(angle)
+    return pts.reshape(total_points, 2)
+
+
+def plot_star_coil(center_x, center_y, initial_radius, turns, spacing, points_per_turn=10, track_width=0.15, inner_ratio=0.60, spiral=None):
+    # Imported here so JSON-only runs never load matplotlib or a GUI backend
+    import matplotlib.pyplot as plt
+
     # Initialize the plot
     fig, ax = plt.subplots(figsize=(6, 6))
 
     num_star_points = points_per_turn // 2  # 5 for a 5-pointed star
 
-    points = generate_star_spiral_points(center_x, center_y, initial_radius, turns, spacing, num_star_points, inner_ratio)
+    # Precomputed (N, 2) spiral from generate_star_spiral_points, if given
+    points = spiral
+    if points is None:
+        points = generate_star_spiral_points(center_x, center_y, initial_radius, turns, spacing, num_star_points, inner_ratio)
 
     print(f"Inner radius (turn 1): {(initial_radius + spacing) * inner_ratio:.3f} mm")
     print(f"Outer radius (turn {turns}): {initial_radius + spacing * turns:.3f} mm")
 
     # Plot the spiral
-    x_coords, y_coords = zip(*points)
-    ax.plot(x_coords, y_coords, 'b-', linewidth=2)
+    ax.plot(points[:, 0], points[:, 1], 'b-', linewidth=2)
 
     # Add labels and set aspect ratio
     ax.set_title("Connected Spiral-In Star Coil")
@@ -64,14 +69,20 @@ def plot_star_coil(center_x, center_y, initial_radius, turns, spacing, points_pe
     plt.show()
 
 
-def generate_star_coil_json(center_x, center_y, initial_radius, turns, spacing, track_width=0.1, filename=None, points_per_turn=10, project_name="default", inner_ratio=0.60):
+def generate_star_coil_json(center_x, center_y, initial_radius, turns, spacing, track_width=0.1, filename=None, points_per_turn=10, project_name="default", inner_ratio=0.60, spiral=None, print_points=False, interactive=True, auto_save=False, auto_footprint=False):
+    # DRC checks against manufacturer constraints
+    coil_drc.report(coil_drc.check_radial(initial_radius, track_width, spacing))
+
     num_star_points = points_per_turn // 2  # 5 for a 5-pointed star
 
-    raw_pts = generate_star_spiral_points(center_x, center_y, initial_radius, turns, spacing, num_star_points, inner_ratio)
-    points = []
-    for p in raw_pts:
-        print(f"  ({p[0]:.3f}, {p[1]:.3f})")
-        points.append({"x": p[0], "y": p[1]})
+    # Precomputed (N, 2) spiral from generate_star_spiral_points, if given
+    raw_pts = spiral
+    if raw_pts is None:
+        raw_pts = generate_star_spiral_points(center_x, center_y, initial_radius, turns, spacing, num_star_points, inner_ratio)
+
+    # Listing every point is for debugging only; it is written in one call
+    if print_points:
+        print("\n".join(f"  ({x:.3f}, {y:.3f})" for x, y in raw_pts.tolist()))
 
     # Print final coil dimensions
     outer_radius = initial_radius + spacing * turns
@@ -85,53 +96,21 @@ def generate_star_coil_json(center_x, center_y, initial_radius, turns, spacing,
     print(f"  Overall diam:   {2 * outer_radius:.3f} mm")
     print(f"----------------------------\n")
 
-    # DRC checks against manufacturer constraints
-    via_hole_diameter = 0.3   # mm
-    via_hole_to_track = 0.2   # mm (via hole edge to track edge)
-    same_net_spacing = 0.15   # mm (track edge to track edge, trace coils)
-    min_track_width = 0.15    # mm (trace coil min width)
-
-    errors = []
-
-    # Via hole to track: center to first trace must fit via hole + clearance
-    min_inner_radius = via_hole_diameter / 2 + via_hole_to_track + track_width / 2
-    if initial_radius < min_inner_radius:
-        errors.append(
-            f"Inner clearance too small for via.\n"
-            f"  Inner radius: {initial_radius:.3f} mm\n"
-            f"  Minimum required: {min_inner_radius:.3f} mm  "
-            f"(via_hole/2={via_hole_diameter/2} + hole_to_track={via_hole_to_track} + track_width/2={track_width/2})"
-        )
-
-    # Same-net track spacing
-    track_gap = spacing - track_width
-    if track_gap < same_net_spacing:
-        errors.append(
-            f"Same-net track spacing too small.\n"
-            f"  Track gap (spacing - track_width): {track_gap:.3f} mm\n"
-            f"  Minimum required: {same_net_spacing} mm"
-        )
-
-    # Minimum track width check
-    if track_width < min_track_width:
-        errors.append(
-            f"Track width too small.\n"
-            f"  Track width: {track_width} mm\n"
-            f"  Minimum required: {min_track_width} mm"
-        )
-
-    if errors:
-        print("ERROR: DRC violations detected:")
-        for i, e in enumerate(errors, 1):
-            print(f"  [{i}] {e}")
-        print("  Fix parameters before generating the coil.")
-
-    # Prepend center point so trace connects from via at center to inner end of spiral
-    points.insert(0, {"x": center_x, "y": center_y})
+    # Front track as an (N, 2) array with the center point prepended so the
+    # trace connects from the via at center to the inner end of the spiral.
+    # Points stay in NumPy and only become JSON columns when the file is written.
+    points = np.empty((len(raw_pts) + 1, 2))
+    points[0] = center_x, center_y
+    points[1:] = raw_pts
 
     # Back layer: mirror X and reverse
     # points[0] is center, points[-1] is outer end (front layer: center -> outward)
-    back_points = [{"x": -p["x"], "y": p["y"]} for p in reversed(points)]
+    back_points = points[::-1] * (-1, 1)
+
+    # Front outer pad at the end of the front spiral; back outer pad at the
+    # start of the back trace (the X-mirrored front outer end)
+    pad_front = points[-1].tolist()
+    pad_back = back_points[0].tolist()
 
     # Prepare the JSON data
     json_data = {
@@ -157,16 +136,16 @@ def generate_star_coil_json(center_x, center_y, initial_radius, turns, spacing,
         ],
         "pads": [
             {
-                "x": points[-1]["x"],
-                "y": points[-1]["y"],
+                "x": pad_front[0],
+                "y": pad_front[1],
                 "width": track_width,
                 "height": track_width,
                 "layer": "f",
                 "clearance": 0.1
             },
             {
-                "x": back_points[0]["x"],
-                "y": back_points[0]["y"],
+                "x": pad_back[0],
+                "y": pad_back[1],
                 "width": track_width,
                 "height": track_width,
                 "layer": "b",
@@ -186,16 +165,21 @@ def generate_star_coil_json(center_x, center_y, initial_radius, turns, spacing,
     coil_json_dir = ensure_coil_json_directory(project_name)
     file_path = os.path.join(coil_json_dir, filename)
 
-    # Prompt user before saving
-    save = input(f"Save to coil_json/{project_name}/{filename}? (y/n): ").strip().lower()
-    if save == 'y':
-        with open(file_path, 'w') as json_file:
-            json.dump(json_data, json_file, indent=4)
+    # Prompt user before saving, or follow auto_save in non-interactive runs
+    if interactive:
+        save = input(f"Save to coil_json/{project_name}/{filename}? (y/n): ").strip().lower() == 'y'
+    else:
+        save = auto_save
+    if save:
+        write_coil_json(json_data, file_path)
         print(f"Star coil JSON saved to coil_json/{project_name}/{filename}")
 
         # Optionally generate footprint immediately
-        gen_fp = input("Generate footprint (.kicad_mod) now? (y/n): ").strip().lower()
-        if gen_fp == 'y':
+        if interactive:
+            gen_fp = input("Generate footprint (.kicad_mod) now? (y/n): ").strip().lower() == 'y'
+        else:
+            gen_fp = auto_footprint
+        if gen_fp:
             fp_dir = ensure_coil_footprints_directory(project_name)
             fp_filename = os.path.splitext(filename)[0] + '.kicad_mod'
             fp_path = os.path.join(fp_dir, fp_filename)
@@ -204,7 +188,47 @@ def generate_star_coil_json(center_x, center_y, initial_radius, turns, spacing,
     else:
         print("Skipped saving.")
 
+
+# Keyword arguments every batch coil starts from; a config may override them
+_BATCH_DEFAULTS = {"interactive": False, "auto_save": True, "auto_footprint": True}
+
+
+def _generate_from_config(config):
+    """Batch worker: save one coil and its footprint without prompting"""
+    generate_star_coil_json(**{**_BATCH_DEFAULTS, **config})
+
+
+def generate_batch(configs, max_workers=None):
+    """
+    Generate many star coils in parallel, one worker process per CPU.
+
+    Each coil is written to its JSON file and footprint without prompting,
+    so a parameter sweep is not serialized behind input() and the file writes.
+
+    Args:
+        configs (list): Keyword-argument dicts for generate_star_coil_json.
+            Values here override the batch defaults (no prompts, save the JSON
+            and footprint).
+        max_workers (int): Number of worker processes. If None, one per CPU.
+
+    Returns:
+        None
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Consume the results so worker exceptions are raised here
+        for _ in executor.map(_generate_from_config, configs, chunksize=8):
+            pass
+
+
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a star spiral coil JSON for KiCad')
+    parser.add_argument('--yes', action='store_true', help='Save the JSON and footprint without prompting')
+    args = parser.parse_args()
+
     # coil = {"center_x": 0, "center_y": 0, "initial_radius": 0.5, "turns": 10, "spacing": 0.6, "points_per_turn": 10}
     coil = {"center_x": 0, 
             "center_y": 0, 
@@ -216,6 +240,17 @@ def main():
             "inner_ratio": 0.55, 
             "project_name": "small_scale_designs"}
 
+    # Compute the spiral once and share it between the plot and the JSON export
+    spiral = generate_star_spiral_points(
+        center_x=coil["center_x"],
+        center_y=coil["center_y"],
+        initial_radius=coil["initial_radius"],
+        turns=coil["turns"],
+        spacing=coil["spacing"],
+        num_star_points=coil["points_per_turn"] // 2,
+        inner_ratio=coil["inner_ratio"]
+    )
+
     show_plot = True
     if show_plot:
         plot_star_coil(
@@ -226,7 +261,8 @@ def main():
             spacing=coil["spacing"],
             points_per_turn=coil["points_per_turn"],
             track_width=coil["track_width"],
-            inner_ratio=coil["inner_ratio"]
+            inner_ratio=coil["inner_ratio"],
+            spiral=spiral
         )
 
     save_json_file = True
@@ -240,7 +276,11 @@ def main():
             track_width=coil["track_width"],
             points_per_turn=coil["points_per_turn"],
             project_name=coil["project_name"],
-            inner_ratio=coil["inner_ratio"]
+            inner_ratio=coil["inner_ratio"],
+            spiral=spiral,
+            interactive=not args.yes,
+            auto_save=True,
+            auto_footprint=True
         )
 
 
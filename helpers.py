@@ -27,6 +27,21 @@ def draw_arc(start_angle, end_angle, radius, step=5):
     return points
 
 
+# e^(i*theta) for theta = np.linspace(0, max_theta, num_points), i.e. cos in
+# .real and sin in .imag from a single pass. The angles are evenly spaced, so
+# within a block each value is the previous one times the constant step
+# e^(i*dtheta). Every `block` points the run is re-seeded from an exact
+# e^(i*theta) so rounding drift can't build up over long (40k point) spirals;
+# the whole thing is one small cumprod plus one broadcast multiply
+def unit_phasors(max_theta, num_points, block=64):
+    step = max_theta / (num_points - 1) if num_points > 1 else 0.0
+    seeds = np.exp(1j * (step * block) * np.arange(-(-num_points // block)))
+    offsets = np.full(block, np.exp(1j * step))
+    offsets[:1] = 1
+    np.cumprod(offsets, out=offsets)
+    return (seeds[:, None] * offsets).ravel()[:num_points]
+
+
 # roate the points by the required angle
 def rotate(points, angle):
     return [
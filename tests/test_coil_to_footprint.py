@@ -0,0 +1,84 @@
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+import coil_to_footprint
+
+
+XS = [0.0, 1.0, 2.0]
+YS = [0.0, 0.5, -0.25]
+
+# The ways a generator or caller may hand over track points, each holding
+# NumPy scalars rather than plain floats
+POINT_FORMS = {
+    "array": lambda: np.array([XS, YS]).T,
+    "v1_dicts": lambda: [{"x": np.float64(x), "y": np.float64(y)} for x, y in zip(XS, YS)],
+    "pairs": lambda: [(np.float64(x), np.float64(y)) for x, y in zip(XS, YS)],
+    "v2_lists": lambda: {"x": [np.float64(x) for x in XS], "y": [np.float64(y) for y in YS]},
+}
+
+
+def _coil_with_numpy_scalars(points):
+    """Coil data as built from a parameter sweep, with NumPy scalars in and around the points"""
+    width = np.float64(0.15)
+    return {
+        "parameters": {"trackWidth": width, "viaDiameter": 0.4, "viaDrillDiameter": 0.3, "turns": np.int64(4)},
+        "tracks": {
+            "f": [{"width": width, "pts": points}],
+            "b": [],
+            "in": [[{"width": width, "pts": points}]],
+        },
+        "vias": [{"x": np.float64(0.0), "y": np.float64(0.0), "net": ""}],
+        "pads": [{"x": np.float64(2.0), "y": np.float64(-0.25), "width": width, "height": width, "layer": "f"}],
+        "silk": [],
+        "edgeCuts": [],
+        "components": [],
+    }
+
+
+def _read_back(path):
+    """Parse a written coil file with the standard library, decompressing .gz"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if path.endswith(".gz"):
+        raw = gzip.decompress(raw)
+    return json.loads(raw)
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def writer(request, monkeypatch):
+    """Run write_coil_json through the orjson fast path and the streaming fallback"""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(coil_to_footprint, "orjson", None)
+    return coil_to_footprint.write_coil_json
+
+
+@pytest.mark.parametrize("form", sorted(POINT_FORMS))
+@pytest.mark.parametrize("filename", ["coil.json", "coil.json.gz"])
+def test_write_coil_json_accepts_numpy_scalars(writer, tmp_path, filename, form):
+    path = str(tmp_path / filename)
+    writer(_coil_with_numpy_scalars(POINT_FORMS[form]()), path)
+    data = _read_back(path)
+
+    assert data["parameters"]["schemaVersion"] == coil_to_footprint.JSON_SCHEMA_VERSION
+    assert data["parameters"]["trackWidth"] == 0.15
+    assert data["parameters"]["turns"] == 4
+    assert data["vias"][0] == {"x": 0.0, "y": 0.0, "net": ""}
+    assert data["pads"][0]["x"] == 2.0
+    assert data["tracks"]["f"][0]["pts"] == {"x": XS, "y": YS}
+    assert data["tracks"]["in"][0][0]["pts"] == {"x": XS, "y": YS}
+    assert data["tracks"]["b"] == []
+
+
+def test_write_coil_json_mirrored_array_view(writer, tmp_path):
+    points = np.array([XS, YS]).T
+    coil = _coil_with_numpy_scalars(points)
+    coil["tracks"]["b"] = [{"width": 0.15, "pts": points[::-1] * (-1, 1)}]
+    path = str(tmp_path / "coil.json")
+    writer(coil, path)
+
+    assert _read_back(path)["tracks"]["b"][0]["pts"] == {"x": [-2.0, -1.0, -0.0], "y": [-0.25, 0.5, 0.0]}